@@ -24,16 +24,56 @@ For more information on Passbolt LDAPS setup, visit:
 https://www.passbolt.com/docs/hosting/configure/ldap/ldaps/
 """
 
+import os
 import sys
+import time
+import select
+import socket
+import hashlib
 import subprocess
 import argparse
+import functools
 import logging
-from datetime import datetime
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from cryptography import x509
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 
+# pyOpenSSL gives us an in-process TLS handshake and access to the full peer
+# certificate chain. It is an optional dependency: without it we fall back to
+# shelling out to the openssl CLI as older versions of this tool did.
+try:
+    from OpenSSL import SSL, crypto as openssl_crypto
+except ImportError:
+    SSL = None
+    openssl_crypto = None
+
+# Connection timeout (seconds) for the TLS handshake with the LDAPS server
+CONNECT_TIMEOUT = 10
+
+# Where retrieved chains are cached on disk between runs (see --cache-ttl)
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'passbolt-ldaps')
+
+# Default freshness window (seconds) for the on-disk chain cache
+DEFAULT_CACHE_TTL = 300
+
+# Module-level TLS context cache. Building an OpenSSL context re-parses the
+# system CA store, which dominates setup cost when the tool probes several
+# servers in one run (e.g. the --test fallback list), so build it once and
+# reuse it for every connection.
+_SSL_CTX = None
+
+def _get_ssl_context():
+    """Return the shared pyOpenSSL client context, creating it on first use."""
+    global _SSL_CTX
+    if _SSL_CTX is None:
+        ctx = SSL.Context(SSL.TLS_CLIENT_METHOD)
+        ctx.set_verify(SSL.VERIFY_NONE)
+        _SSL_CTX = ctx
+    return _SSL_CTX
+
 # ANSI color codes for better readability in terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -44,6 +84,13 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# Emit ANSI colors only when stdout is a terminal, so redirected or piped
+# output does not get polluted with escape codes
+_USE_COLOR = sys.stdout.isatty()
+
+# Looked up once at import instead of per certificate in the debug printer
+_CN_OID = x509.NameOID.COMMON_NAME
+
 def setup_colored_logging():
     """Setup colored logging for better readability of debug output"""
     logging.basicConfig(
@@ -52,8 +99,74 @@ def setup_colored_logging():
     )
 
 def print_colored(message, color=Colors.ENDC):
-    """Print a colored message to the terminal"""
-    print(f"{color}{message}{Colors.ENDC}")
+    """Print a message to the terminal, colored when stdout is a TTY"""
+    if _USE_COLOR:
+        print(f"{color}{message}{Colors.ENDC}")
+    else:
+        print(message)
+
+@functools.lru_cache(maxsize=256)
+def _load_certificate(cert_der):
+    """
+    Parse a DER certificate, caching the result.
+
+    The same DER bytes are inspected by validation, debug printing and output
+    formatting; caching the parsed Certificate avoids re-decoding the ASN.1
+    structure at every call site.
+    """
+    return x509.load_der_x509_certificate(cert_der)
+
+def _read_tlv(data, offset):
+    """
+    Read one ASN.1 DER TLV at the given offset.
+
+    Returns:
+        tuple: (tag, content_start, end) - end is the offset just past the value
+    """
+    tag = data[offset]
+    idx = offset + 1
+    length = data[idx]
+    idx += 1
+    if length & 0x80:
+        num_octets = length & 0x7F
+        length = int.from_bytes(data[idx:idx + num_octets], 'big')
+        idx += num_octets
+    return tag, idx, idx + length
+
+def _extract_issuer_subject_spans(cert_der):
+    """
+    Extract the raw DER spans of a certificate's issuer and subject Names.
+
+    Chain-order validation only needs DN equality, and RFC 5280 defines Name
+    matching for modern certificates as a binary comparison of the encoded
+    Name, so walking the TBSCertificate header is enough - no full ASN.1
+    parse of the certificate is required.
+
+    Returns:
+        tuple: (issuer_bytes, subject_bytes) including the Name TLV headers
+    """
+    try:
+        # Certificate -> tbsCertificate
+        _, tbs_start, _ = _read_tlv(cert_der, 0)
+        _, offset, _ = _read_tlv(cert_der, tbs_start)
+        # Optional [0] EXPLICIT version
+        if cert_der[offset] == 0xA0:
+            _, _, offset = _read_tlv(cert_der, offset)
+        # serialNumber INTEGER, then signature AlgorithmIdentifier
+        _, _, offset = _read_tlv(cert_der, offset)
+        _, _, offset = _read_tlv(cert_der, offset)
+        # issuer Name
+        _, _, issuer_end = _read_tlv(cert_der, offset)
+        issuer = bytes(cert_der[offset:issuer_end])
+        # validity SEQUENCE
+        _, _, offset = _read_tlv(cert_der, issuer_end)
+        # subject Name
+        _, _, subject_end = _read_tlv(cert_der, offset)
+        subject = bytes(cert_der[offset:subject_end])
+    except IndexError:
+        # A truncated TLV walks past the end of the buffer
+        raise ValueError("malformed DER certificate") from None
+    return issuer, subject
 
 def is_self_signed(cert):
     """
@@ -64,7 +177,7 @@ def is_self_signed(cert):
     """
     return cert.issuer == cert.subject
 
-def print_certificate_info(cert_data, is_root=False):
+def print_certificate_info(cert, is_root=False):
     """
     Print human-readable certificate information.
 
@@ -72,22 +185,15 @@ def print_certificate_info(cert_data, is_root=False):
     to verify the correct certificates were retrieved.
 
     Args:
-        cert_data (bytes): The certificate data in DER format
+        cert (x509.Certificate): The parsed certificate
         is_root (bool): Whether this is a root certificate
     """
-    cert = x509.load_der_x509_certificate(cert_data, default_backend())
-
-    # Get common name from subject
-    subject_cn = None
-    for name in cert.subject.get_attributes_for_oid(x509.NameOID.COMMON_NAME):
-        subject_cn = name.value
-        break
-
-    # Get common name from issuer
-    issuer_cn = None
-    for name in cert.issuer.get_attributes_for_oid(x509.NameOID.COMMON_NAME):
-        issuer_cn = name.value
-        break
+    # Get common names from subject and issuer; a single walk per Name avoids
+    # the intermediate list get_attributes_for_oid() builds
+    subject_cn = next((attr.value for attr in cert.subject
+                       if attr.oid == _CN_OID), None)
+    issuer_cn = next((attr.value for attr in cert.issuer
+                      if attr.oid == _CN_OID), None)
 
     cert_type = "Root Certificate" if is_root else "Certificate"
     if is_self_signed(cert):
@@ -113,32 +219,34 @@ def validate_certificate_chain(cert_ders):
     if not cert_ders:
         return False, "No certificates found in chain"
 
-    try:
-        # Load all certificates
-        certs = [x509.load_der_x509_certificate(cert, default_backend())
-                for cert in cert_ders]
-
-        # Check if single self-signed certificate
-        if len(certs) == 1 and is_self_signed(certs[0]):
-            return True, "Valid self-signed certificate"
+    # Memoize on the chain bytes so repeat validations of the same chain
+    # (retries, batch runs, tests) skip the parsing and comparison work.
+    return _validate_certificate_chain_cached(tuple(cert_ders))
 
-        # Check if each certificate's issuer matches the subject of the next certificate
-        for i in range(len(certs) - 1):
-            cert = certs[i]
-            issuer = certs[i + 1]
-
-            # Get issuer and subject DNs
-            cert_issuer_dn = cert.issuer
-            next_cert_subject_dn = issuer.subject
-
-            if cert_issuer_dn != next_cert_subject_dn:
-                # Check if current certificate is self-signed
-                if is_self_signed(cert):
-                    return True, f"Chain contains self-signed certificate at position {i}"
-                return False, f"Certificate chain broken at position {i}: issuer does not match next certificate's subject"
+@functools.lru_cache(maxsize=256)
+def _validate_certificate_chain_cached(cert_ders):
+    """Validate a chain given as a tuple of DER blobs. See validate_certificate_chain."""
+    try:
+        # Single pass over the chain: pull each certificate's raw
+        # issuer/subject DN spans once and compare against the previous link
+        # as we go; self-signedness is only checked where it matters (on a
+        # broken link and on the final certificate)
+        prev = None  # (issuer_dn, subject_dn) of the previous certificate
+        for i, cert_der in enumerate(cert_ders):
+            spans = _extract_issuer_subject_spans(cert_der)
+
+            if prev is not None and prev[0] != spans[1]:
+                # Broken link; tolerated if the earlier certificate is self-signed
+                if prev[0] == prev[1]:
+                    return True, f"Chain contains self-signed certificate at position {i - 1}"
+                return False, f"Certificate chain broken at position {i - 1}: issuer does not match next certificate's subject"
+
+            prev = spans
 
         # Check if the last certificate is self-signed (root CA)
-        if is_self_signed(certs[-1]):
+        if prev[0] == prev[1]:
+            if len(cert_ders) == 1:
+                return True, "Valid self-signed certificate"
             return True, "Certificate chain is valid and ends with self-signed root CA"
 
         return True, "Certificate chain is valid and properly ordered"
@@ -146,92 +254,275 @@ def validate_certificate_chain(cert_ders):
     except Exception as e:
         return False, f"Error validating certificate chain: {str(e)}"
 
-def get_ldap_ssl_certificates(ldap_server_host, port=636, debug=False):
+def _wait_for_handshake_io(sock, deadline, want_read):
+    """
+    Block until the socket is ready for the handshake to continue.
+
+    Raises TimeoutError with a descriptive message once the deadline passes,
+    instead of letting a bare WantReadError (whose str() is empty) escape.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        if want_read:
+            ready = select.select([sock], [], [], remaining)[0]
+        else:
+            ready = select.select([], [sock], [], remaining)[1]
+        if ready:
+            return
+    raise TimeoutError(f"TLS handshake timed out after {CONNECT_TIMEOUT} seconds")
+
+def _retrieve_chain_in_process(ldap_server_host, port, debug=False):
+    """
+    Retrieve the server's certificate chain with an in-process TLS handshake.
+
+    Uses pyOpenSSL to perform the handshake directly, avoiding the cost of
+    spawning an external openssl process and re-parsing its text output.
+    Verification is intentionally disabled: the whole point of this tool is to
+    fetch certificates we do not trust yet.
+
+    Args:
+        ldap_server_host (str): The LDAP server hostname
+        port (int): The LDAPS port
+        debug (bool): Enable detailed debug output
+
+    Returns:
+        list: Certificates in DER format, leaf first
+    """
+    ctx = _get_ssl_context()
+
+    sock = socket.create_connection((ldap_server_host, port), timeout=CONNECT_TIMEOUT)
+    try:
+        conn = SSL.Connection(ctx, sock)
+        # SNI, equivalent to openssl s_client -servername
+        conn.set_tlsext_host_name(ldap_server_host.encode())
+        conn.set_connect_state()
+
+        # The socket timeout above puts the fd in non-blocking mode, so the
+        # handshake raises WantRead/WantWrite whenever it has to wait for the
+        # server; wait on the socket and retry until the deadline passes
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while True:
+            try:
+                conn.do_handshake()
+                break
+            except SSL.WantReadError:
+                _wait_for_handshake_io(sock, deadline, want_read=True)
+            except SSL.WantWriteError:
+                _wait_for_handshake_io(sock, deadline, want_read=False)
+
+        if debug:
+            print_colored(f"\nNegotiated {conn.get_protocol_version_name()} with cipher {conn.get_cipher_name()}", Colors.GREEN)
+
+        chain = conn.get_peer_cert_chain() or []
+        return [openssl_crypto.dump_certificate(openssl_crypto.FILETYPE_ASN1, cert)
+                for cert in chain]
+    finally:
+        sock.close()
+
+def _retrieve_chain_via_openssl_cli(ldap_server_host, port, debug=False):
     """
-    Retrieve SSL certificates from an LDAPS server using OpenSSL.
+    Retrieve the server's certificate chain using the openssl CLI.
+
+    Fallback path for environments without pyOpenSSL. Shells out to
+    `openssl s_client -showcerts` and parses the PEM blocks from its output.
+
+    Args:
+        ldap_server_host (str): The LDAP server hostname
+        port (int): The LDAPS port
+        debug (bool): Enable detailed debug output
+
+    Returns:
+        list: Certificates in DER format, leaf first
+    """
+    cmd = [
+        'openssl', 's_client',
+        '-connect', f'{ldap_server_host}:{port}',
+        '-showcerts',
+        '-servername', ldap_server_host
+    ]
+
+    if debug:
+        print_colored(f"Running command: {' '.join(cmd)}", Colors.YELLOW)
+
+    # Run OpenSSL command. The timeout guards against servers that accept the
+    # TCP connection but never complete the handshake, which would otherwise
+    # hang s_client (and us) indefinitely.
+    result = subprocess.run(
+        cmd,
+        input=b'\n',
+        capture_output=True,
+        timeout=CONNECT_TIMEOUT,
+        check=False
+    )
+    stdout, stderr = result.stdout, result.stderr
+
+    if debug and stderr:
+        print_colored("\nOpenSSL Connection Details:", Colors.BOLD)
+        # Scan the raw bytes and only decode the lines that get printed
+        for line in stderr.splitlines():
+            if line.strip() and not line.startswith(b'DONE'):
+                text = line.decode('utf-8', 'replace')
+                if b'verify return:1' in line:
+                    print_colored(f"  {text}", Colors.GREEN)
+                else:
+                    print_colored(f"  {text}", Colors.BLUE)
+
+    # Parse all certificates from the output in one native-code call; the
+    # Rust-backed multi-PEM parser skips the surrounding s_client chatter
+    # and replaces the per-block Python parse loop.
+    try:
+        certs = x509.load_pem_x509_certificates(stdout)
+    except ValueError:
+        certs = []
+
+    if not certs and debug:
+        print_colored("\nRaw output from OpenSSL:", Colors.RED)
+        print_colored(stdout.decode('utf-8', 'replace'), Colors.RED)
+
+    # Convert PEM to DER for consistency with the rest of the code
+    return [cert.public_bytes(serialization.Encoding.DER) for cert in certs]
+
+@dataclass(frozen=True)
+class ChainSummary:
+    """
+    Compact record of an already-validated chain.
+
+    Revalidating a chain only needs its validity window and an identity for
+    the leaf key, so keeping these three fields lets callers re-check a chain
+    without retaining (or re-parsing) the full DER blobs.
+    """
+    leaf_pubkey_sha256: bytes
+    latest_not_before: datetime
+    earliest_not_after: datetime
+
+# Summaries of chains seen by this process, keyed by SHA-256 of the
+# concatenated DER bytes - the same identity the validation cache keys on
+_CHAIN_SUMMARIES = {}
+
+def summarize_chain(cert_ders, certs):
+    """
+    Build and remember a ChainSummary for a retrieved chain.
+
+    Args:
+        cert_ders (list): The chain as DER blobs, leaf first
+        certs (list): The same chain as parsed x509.Certificate objects
+
+    Returns:
+        ChainSummary: The summary stored for this chain
+    """
+    key = hashlib.sha256(b''.join(cert_ders)).digest()
+    summary = _CHAIN_SUMMARIES.get(key)
+    if summary is None:
+        leaf_spki = certs[0].public_key().public_bytes(
+            serialization.Encoding.DER,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        summary = ChainSummary(
+            leaf_pubkey_sha256=hashlib.sha256(leaf_spki).digest(),
+            latest_not_before=max(cert.not_valid_before_utc for cert in certs),
+            earliest_not_after=min(cert.not_valid_after_utc for cert in certs),
+        )
+        _CHAIN_SUMMARIES[key] = summary
+    return summary
+
+def revalidate_cached(summary):
+    """
+    Re-check a previously validated chain from its summary alone.
+
+    Only the validity window can change between runs, so this is a pair of
+    timestamp comparisons instead of any DN or signature work.
+
+    Returns:
+        bool: True if the chain is still within its validity window
+    """
+    now = datetime.now(timezone.utc)
+    return summary.latest_not_before <= now <= summary.earliest_not_after
+
+def _chain_cache_path(ldap_server_host, port):
+    """Return the on-disk cache file for a given (host, port)."""
+    return os.path.join(CACHE_DIR, f'{ldap_server_host}_{port}.pem')
+
+def _read_cached_chain(ldap_server_host, port, cache_ttl):
+    """
+    Load a previously retrieved chain from the on-disk cache.
+
+    Returns the chain as a list of DER blobs if a cache file exists and is
+    younger than cache_ttl seconds, otherwise None. Any unreadable or
+    unparsable cache file is treated as a miss.
+    """
+    path = _chain_cache_path(ldap_server_host, port)
+    try:
+        if time.time() - os.path.getmtime(path) >= cache_ttl:
+            return None
+        with open(path, 'rb') as f:
+            certs = x509.load_pem_x509_certificates(f.read())
+    except (OSError, ValueError):
+        return None
+    return [cert.public_bytes(serialization.Encoding.DER) for cert in certs]
+
+def _write_cached_chain(ldap_server_host, port, certs):
+    """Store a retrieved chain as a PEM bundle for reuse by later runs."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_chain_cache_path(ldap_server_host, port), 'wb') as f:
+            for cert in certs:
+                f.write(cert.public_bytes(serialization.Encoding.PEM))
+    except OSError:
+        # Caching is best-effort; a read-only home directory is not an error
+        pass
+
+def get_ldap_ssl_certificates(ldap_server_host, port=636, debug=False,
+                              cache_ttl=DEFAULT_CACHE_TTL, refresh=False):
+    """
+    Retrieve SSL certificates from an LDAPS server.
 
     This function connects to the LDAPS server and retrieves its certificate chain,
     handling both standard and self-signed certificates. The certificates can then
-    be used in Passbolt's LDAPS configuration.
+    be used in Passbolt's LDAPS configuration. The handshake is performed
+    in-process when pyOpenSSL is available, otherwise via the openssl CLI.
+
+    Admins typically re-run the tool against the same server while iterating
+    on their Passbolt configuration, so retrieved chains are cached on disk
+    for a short time and reused instead of redoing the network round trip.
 
     Args:
         ldap_server_host (str): The LDAP server hostname
         port (int): The LDAPS port (default: 636)
         debug (bool): Enable detailed debug output
+        cache_ttl (int): Maximum age in seconds of a reusable cached chain;
+            0 disables the cache
+        refresh (bool): Ignore any cached chain and contact the server
 
     Returns:
         dict: Dictionary containing:
-            - peer_certificate: The server's certificate
-            - peer_certificate_chain: List of CA certificates in the chain
+            - peer_certificate: The server's certificate (DER bytes)
+            - peer_certificate_chain: List of CA certificates in the chain (DER bytes)
+            - certificates: The full chain as parsed x509.Certificate objects,
+              leaf first, for consumers that would otherwise re-parse the DER
     """
     if debug:
         setup_colored_logging()
         print_colored(f"\nConnecting to {ldap_server_host}:{port}", Colors.BLUE)
 
     try:
-        # First, try to get the certificate using openssl s_client
-        cmd = [
-            'openssl', 's_client',
-            '-connect', f'{ldap_server_host}:{port}',
-            '-showcerts',
-            '-servername', ldap_server_host
-        ]
-
-        if debug:
-            print_colored(f"Running command: {' '.join(cmd)}", Colors.YELLOW)
-
-        # Run OpenSSL command
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            stdin=subprocess.PIPE
-        )
+        cert_ders = None
+        if cache_ttl > 0 and not refresh:
+            cert_ders = _read_cached_chain(ldap_server_host, port, cache_ttl)
+            if cert_ders and debug:
+                print_colored(f"Using cached certificate chain for {ldap_server_host}:{port}", Colors.GREEN)
+        from_cache = bool(cert_ders)
+
+        if not cert_ders:
+            if SSL is not None:
+                cert_ders = _retrieve_chain_in_process(ldap_server_host, port, debug)
+            else:
+                cert_ders = _retrieve_chain_via_openssl_cli(ldap_server_host, port, debug)
 
-        # Send empty input and get output
-        stdout, stderr = process.communicate(input=b'\n')
-        output = stdout.decode('utf-8')
-
-        if debug and stderr:
-            stderr_output = stderr.decode('utf-8')
-            print_colored("\nOpenSSL Connection Details:", Colors.BOLD)
-            for line in stderr_output.splitlines():
-                if line.strip() and not line.startswith('DONE'):
-                    if 'verify return:1' in line:
-                        print_colored(f"  {line}", Colors.GREEN)
-                    else:
-                        print_colored(f"  {line}", Colors.BLUE)
-
-        # Parse the certificates from the output
-        certs = []
-        current_cert = []
-        in_cert = False
-
-        for line in output.splitlines():
-            if '-----BEGIN CERTIFICATE-----' in line:
-                in_cert = True
-                current_cert = [line]
-            elif '-----END CERTIFICATE-----' in line:
-                in_cert = False
-                current_cert.append(line)
-                certs.append('\n'.join(current_cert))
-            elif in_cert:
-                current_cert.append(line)
-
-        if not certs:
-            if debug:
-                print_colored("\nRaw output from OpenSSL:", Colors.RED)
-                print_colored(output, Colors.RED)
+        if not cert_ders:
             raise Exception("No certificates found in the server response")
 
         if debug:
-            print_colored(f"\nFound {len(certs)} certificates in chain", Colors.GREEN)
-
-        # Convert PEM to DER for consistency with the rest of the code
-        cert_ders = []
-        for cert_pem in certs:
-            cert = x509.load_pem_x509_certificate(cert_pem.encode(), default_backend())
-            cert_ders.append(cert.public_bytes(serialization.Encoding.DER))
+            print_colored(f"\nFound {len(cert_ders)} certificates in chain", Colors.GREEN)
 
         # Validate the certificate chain
         is_valid, validation_message = validate_certificate_chain(cert_ders)
@@ -241,48 +532,70 @@ def get_ldap_ssl_certificates(ldap_server_host, port=636, debug=False):
             else:
                 print_colored(f"\nCertificate Chain Validation: {validation_message}", Colors.RED)
 
+        # Parse each certificate exactly once; validation works on the raw
+        # DER spans and everything downstream shares these objects
+        certs = [_load_certificate(cert_der) for cert_der in cert_ders]
+
+        if cache_ttl > 0 and not from_cache:
+            _write_cached_chain(ldap_server_host, port, certs)
+
+        # Record a compact summary so later revalidations of this chain only
+        # need a timestamp check (see revalidate_cached)
+        summarize_chain(cert_ders, certs)
+
         # Print certificate information in debug mode
         if debug:
-            for i, cert_der in enumerate(cert_ders):
-                is_root = (i == len(cert_ders) - 1)
-                print_certificate_info(cert_der, is_root)
+            for i, cert in enumerate(certs):
+                is_root = (i == len(certs) - 1)
+                print_certificate_info(cert, is_root)
 
         return {
             'peer_certificate': cert_ders[0],
-            'peer_certificate_chain': cert_ders[1:] if len(cert_ders) > 1 else []
+            'peer_certificate_chain': cert_ders[1:] if len(cert_ders) > 1 else [],
+            'certificates': certs
         }
 
-    except subprocess.CalledProcessError as e:
+    except subprocess.TimeoutExpired as e:
         if debug:
-            print_colored(f"\nOpenSSL command failed: {e}", Colors.RED)
+            print_colored(f"\nOpenSSL command timed out: {e}", Colors.RED)
         raise
     except Exception as e:
         if debug:
             print_colored(f"\nUnexpected error: {str(e)}", Colors.RED)
         raise
 
-def format_certificate(cert_data, format='pem'):
+def write_certificate_bundle(certificates, format='pem', output=None):
     """
-    Format certificate data in the specified format.
+    Format a retrieved certificate chain and write it to a file or stdout.
 
-    Passbolt typically expects certificates in PEM format, but DER is also
-    supported for special cases.
+    Streams one certificate at a time in binary mode rather than
+    concatenating the whole bundle in memory first, so peak memory stays at
+    one certificate regardless of chain length.
 
     Args:
-        cert_data (bytes): Raw certificate data in DER format
+        certificates (dict): Result of get_ldap_ssl_certificates
         format (str): Output format ('pem' or 'der')
-
-    Returns:
-        str/bytes: Formatted certificate
+        output (str): Output file path, or None for stdout
     """
-    cert = x509.load_der_x509_certificate(cert_data, default_backend())
-    if format == 'pem':
-        return cert.public_bytes(serialization.Encoding.PEM).decode('utf-8')
-    elif format == 'der':
-        return cert.public_bytes(serialization.Encoding.DER)
+    if format == 'der':
+        # The DER bytes were captured at retrieval time; write them verbatim
+        # instead of re-serializing every certificate
+        parts = [certificates['peer_certificate'], *certificates['peer_certificate_chain']]
+    elif format == 'pem':
+        parts = (cert.public_bytes(serialization.Encoding.PEM)
+                 for cert in certificates['certificates'])
     else:
         raise ValueError(f"Unsupported format: {format}")
 
+    if output:
+        with open(output, 'wb') as f:
+            for part in parts:
+                f.write(part)
+    else:
+        for part in parts:
+            sys.stdout.buffer.write(part)
+        sys.stdout.buffer.flush()
+
 def main():
     parser = argparse.ArgumentParser(
         description='Retrieve SSL certificates from an LDAPS server for Passbolt configuration',
@@ -301,6 +614,10 @@ def main():
                       help='Output format (default: pem)')
     parser.add_argument('--output', type=str,
                       help='Output file path (default: stdout)')
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_CACHE_TTL,
+                      help=f'Reuse chains cached on disk for up to this many seconds; 0 disables caching (default: {DEFAULT_CACHE_TTL})')
+    parser.add_argument('--refresh', action='store_true',
+                      help='Ignore any cached chain and contact the server')
 
     # If no arguments provided, show help and exit
     if len(sys.argv) == 1:
@@ -310,57 +627,54 @@ def main():
     args = parser.parse_args()
 
     if args.test:
-        # Try Google's LDAP server first, fall back to Forumsys if it fails
+        # Try Google's LDAP server first, fall back to Forumsys if it fails.
+        # Both probes are network-bound, so fire them concurrently and collect
+        # the results in preference order to keep the output deterministic.
         test_servers = ['ldap.google.com', 'ldap.forumsys.com']
         last_error = None
 
-        for server in test_servers:
-            try:
-                print_colored(f"Trying test server: {server}", Colors.BLUE)
-                args.server = server
-                certificates = get_ldap_ssl_certificates(args.server, args.port, args.debug)
-
-                # Format and combine certificates
-                bundle = format_certificate(certificates['peer_certificate'], args.format)
-                for cert in certificates['peer_certificate_chain']:
-                    if args.format == 'pem':
-                        bundle += format_certificate(cert, args.format)
-                    else:
-                        bundle += cert
-
-                if args.output:
-                    with open(args.output, 'wb' if args.format == 'der' else 'w') as f:
-                        f.write(bundle)
-                else:
-                    print(bundle)
-                return
+        # Daemon threads rather than a ThreadPoolExecutor: pool workers are
+        # non-daemon and get joined at interpreter exit, so a straggling
+        # probe would delay process exit even after the bundle is written
+        results = {}
 
+        def probe(server):
+            try:
+                results[server] = ('ok', get_ldap_ssl_certificates(server, args.port, args.debug,
+                                                                   args.cache_ttl, args.refresh))
             except Exception as e:
-                last_error = e
-                if args.debug:
-                    print_colored(f"Failed to connect to {server}: {str(e)}", Colors.RED)
-                continue
+                results[server] = ('error', e)
+
+        threads = {}
+        for server in test_servers:
+            threads[server] = threading.Thread(target=probe, args=(server,), daemon=True)
+            threads[server].start()
+
+        for server in test_servers:
+            print_colored(f"Trying test server: {server}", Colors.BLUE)
+            # Each probe is bounded by the handshake/subprocess timeout; the
+            # margin covers certificate parsing on a loaded machine
+            threads[server].join(CONNECT_TIMEOUT + 5)
+            if server not in results:
+                last_error = TimeoutError(f"Timed out waiting for {server}")
+            else:
+                status, value = results[server]
+                if status == 'ok':
+                    args.server = server
+                    write_certificate_bundle(value, args.format, args.output)
+                    return
+                last_error = value
+            if args.debug:
+                print_colored(f"Failed to connect to {server}: {str(last_error)}", Colors.RED)
 
         # If we get here, all test servers failed
         print_colored(f"Error: All test servers failed. Last error: {str(last_error)}", Colors.RED)
         sys.exit(1)
 
     try:
-        certificates = get_ldap_ssl_certificates(args.server, args.port, args.debug)
-
-        # Format and combine certificates
-        bundle = format_certificate(certificates['peer_certificate'], args.format)
-        for cert in certificates['peer_certificate_chain']:
-            if args.format == 'pem':
-                bundle += format_certificate(cert, args.format)
-            else:
-                bundle += cert
-
-        if args.output:
-            with open(args.output, 'wb' if args.format == 'der' else 'w') as f:
-                f.write(bundle)
-        else:
-            print(bundle)
+        certificates = get_ldap_ssl_certificates(args.server, args.port, args.debug,
+                                                 args.cache_ttl, args.refresh)
+        write_certificate_bundle(certificates, args.format, args.output)
 
     except Exception as e:
         print_colored(f"Error: {str(e)}", Colors.RED)
@@ -1,5 +1,10 @@
 import os
+import ssl
 import sys
+import time
+import socket
+import datetime
+import threading
 
 # Add project root to Python path
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -7,41 +12,155 @@ sys.path.insert(0, ROOT_DIR)
 
 import pytest
 from cryptography import x509
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from ldaps_cert_chain_retriever import validate_certificate_chain
 
 GOOGLE_PEM_PATH = os.path.join(os.path.dirname(__file__), "google-ldap.pem")
 
 @pytest.mark.skipif(not os.path.exists(GOOGLE_PEM_PATH), reason="google-ldap.pem not present")
 def test_google_ldap_chain_is_valid():
-    with open(GOOGLE_PEM_PATH, "r") as f:
+    with open(GOOGLE_PEM_PATH, "rb") as f:
         pem_data = f.read()
 
-    # Split full PEM chain into individual certs
-    pem_blocks = []
-    current_cert = []
-    in_cert = False
-
-    for line in pem_data.splitlines():
-        if "-----BEGIN CERTIFICATE-----" in line:
-            in_cert = True
-            current_cert = [line]
-        elif "-----END CERTIFICATE-----" in line:
-            current_cert.append(line)
-            pem_blocks.append("\n".join(current_cert))
-            in_cert = False
-        elif in_cert:
-            current_cert.append(line)
-
-    # Load and convert each cert to DER
+    # Load the full PEM chain in one call and convert each cert to DER
     cert_ders = [
-        x509.load_pem_x509_certificate(pem.encode(), default_backend()).public_bytes(
-            encoding=serialization.Encoding.DER
-        )
-        for pem in pem_blocks
+        cert.public_bytes(encoding=serialization.Encoding.DER)
+        for cert in x509.load_pem_x509_certificates(pem_data)
     ]
 
     # Run validation
     is_valid, msg = validate_certificate_chain(cert_ders)
     assert is_valid, f"Google LDAPS cert chain should be valid, but got: {msg}"
+
+def _make_cert(subject_cn, issuer_cn, signing_key=None):
+    """Generate a test certificate; self-signed unless a signing key is given."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, subject_cn)]))
+        .issuer_name(x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, issuer_cn)]))
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(hours=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(signing_key or key, hashes.SHA256())
+    )
+    return cert, key
+
+def _cert_der(cert):
+    return cert.public_bytes(serialization.Encoding.DER)
+
+def _der_tlv(tag, content):
+    """Encode one ASN.1 DER TLV."""
+    length = len(content)
+    if length < 0x80:
+        return bytes([tag, length]) + content
+    size = (length.bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + length.to_bytes(size, "big") + content
+
+def _der_name(cn):
+    """Encode a Name holding a single CN RDN."""
+    oid_cn = bytes.fromhex("550403")  # 2.5.4.3
+    atv = _der_tlv(0x30, _der_tlv(0x06, oid_cn) + _der_tlv(0x0C, cn.encode()))
+    return _der_tlv(0x30, _der_tlv(0x31, atv))
+
+def _fake_v1_cert_der(issuer_cn, subject_cn):
+    """
+    Build a minimal v1 certificate DER (no [0] version field).
+
+    CertificateBuilder always emits v3, but the validator only walks the
+    TBSCertificate header, so a skeleton without a real signature is enough
+    to exercise the v1 layout.
+    """
+    tbs = (
+        _der_tlv(0x02, b"\x01")          # serialNumber
+        + _der_tlv(0x30, b"")            # signature AlgorithmIdentifier
+        + _der_name(issuer_cn)           # issuer
+        + _der_tlv(0x30, b"")            # validity
+        + _der_name(subject_cn)          # subject
+    )
+    return _der_tlv(0x30, _der_tlv(0x30, tbs))
+
+def test_empty_chain_is_invalid():
+    is_valid, msg = validate_certificate_chain([])
+    assert not is_valid
+    assert msg == "No certificates found in chain"
+
+def test_single_self_signed_certificate():
+    cert, _ = _make_cert("ldap.internal", "ldap.internal")
+    is_valid, msg = validate_certificate_chain([_cert_der(cert)])
+    assert is_valid
+    assert msg == "Valid self-signed certificate"
+
+def test_chain_ending_in_self_signed_root():
+    root, root_key = _make_cert("Test Root CA", "Test Root CA")
+    leaf, _ = _make_cert("ldap.internal", "Test Root CA", signing_key=root_key)
+    is_valid, msg = validate_certificate_chain([_cert_der(leaf), _cert_der(root)])
+    assert is_valid
+    assert msg == "Certificate chain is valid and ends with self-signed root CA"
+
+def test_broken_chain_reports_position():
+    leaf, _ = _make_cert("ldap.internal", "Test Root CA")
+    unrelated, _ = _make_cert("Other CA", "Other CA")
+    is_valid, msg = validate_certificate_chain([_cert_der(leaf), _cert_der(unrelated)])
+    assert not is_valid
+    assert "broken at position 0" in msg
+
+def test_v1_certificate_without_version_field():
+    der = _fake_v1_cert_der("ldap.internal", "ldap.internal")
+    is_valid, msg = validate_certificate_chain([der])
+    assert is_valid
+    assert msg == "Valid self-signed certificate"
+
+def test_malformed_der_is_reported():
+    is_valid, msg = validate_certificate_chain([b"\x30\x82\xff\xff not a certificate"])
+    assert not is_valid
+    assert msg == "Error validating certificate chain: malformed DER certificate"
+
+def test_in_process_handshake_tolerates_slow_server(tmp_path):
+    """The pyOpenSSL handshake must retry WantRead/WantWrite on a slow server."""
+    retriever = pytest.importorskip("ldaps_cert_chain_retriever")
+    if retriever.SSL is None:
+        pytest.skip("pyOpenSSL not installed")
+
+    cert, key = _make_cert("localhost", "localhost")
+    cert_path = tmp_path / "server.pem"
+    key_path = tmp_path / "server.key"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ))
+
+    server_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    server_ctx.load_cert_chain(cert_path, key_path)
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    port = listener.getsockname()[1]
+
+    def serve():
+        conn, _ = listener.accept()
+        # Delay the ServerHello so the client's first do_handshake() attempt
+        # has nothing to read and must wait instead of failing
+        time.sleep(0.3)
+        try:
+            tls = server_ctx.wrap_socket(conn, server_side=True)
+            tls.close()
+        except Exception:
+            conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    try:
+        cert_ders = retriever._retrieve_chain_in_process("127.0.0.1", port)
+    finally:
+        thread.join(5)
+        listener.close()
+
+    assert len(cert_ders) == 1
+    assert x509.load_der_x509_certificate(cert_ders[0]).subject == cert.subject